@@ -22,6 +22,7 @@ Data source:
 Usage:
   Run this script directly. It will create a 'catalog_data' directory (if not exists)
   and store all output files there.
+  Pass --parallel to parse the catalog with a pool of worker processes.
 
 Note:
   If IAU-CSN.txt already exists locally, the script will use that file instead of
@@ -64,11 +65,16 @@ The update on 2024-07-01:
 """
 
 import os
-import collections
+import argparse
+import contextlib
+import io
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 import json
 import re
 from urllib import request
 import difflib
+import operator
 
 # Greek letter mappings (UTF-8 codes)
 # Modified from http://simbad.u-strasbg.fr/guide/chA.htx
@@ -82,62 +88,96 @@ greek = {
 }
 # fmt:on
 
-# Create output directory
-if not os.path.exists("catalog_data"):
-    print('Creating folder "catalog_data"...')
-    os.makedirs("catalog_data")
-
-# Download or use existing catalog file
-catalog_local_copy = "catalog_data/IAU-CSN.txt"
-not_downloaded = False
-
-if os.path.exists(catalog_local_copy):
-    print(f"{catalog_local_copy} already exists. Using existing file.")
-    print("Delete the file and run this script again to download the current version.")
-    not_downloaded = True
-else:
-    print("Downloading star names from WGSN...")
-    local_proxies = request.getproxies()
-    if local_proxies:
-        print("Proxy server found. Using", local_proxies)
-        request.install_opener(request.build_opener(request.ProxyHandler(local_proxies)))
-    request.urlretrieve("http://www.pas.rochester.edu/~emamajek/WGSN/IAU-CSN.txt", catalog_local_copy)
-
 # Preprocessing functions
 def dummy_preprocess(value):
     return value
 
+# Greek variant letterforms and the capital phi seen in past catalog versions,
+# mapped to the plain small letters used by the ID/Diacritics column.
+# Extend it here if other variant letterforms show up in the catalog.
+# fmt:off
+lowercase_table = str.maketrans({
+    "ϕ": "φ", "Φ": "φ", "ϐ": "β", "ϵ": "ε", "ϑ": "θ",
+    "ϰ": "κ", "ϖ": "π", "ϱ": "ρ", "ς": "σ",
+})
+# fmt:on
+
 def lowercase_preprocess(value):
     """
     Normalize the character "ϕ" (unicode U+03D5 "Greek Phi Symbol ϕ")
       to "φ" (unicode U+03C6 "Greek Small Letter Phi φ")for consistency.
+    Also maps the other variant letterforms in lowercase_table, e.g. "ϑ" to "θ"
+      and the capital "Φ" to "φ".
     """
-    return value.upper().lower().strip()
+    return value.translate(lowercase_table).strip()
 
 def empty_to_underscore_preprocess(value):
     """Convert empty values to underscores."""
     return "_" if value == "" else value
 
+# Validator patterns, compiled once at import time.
+# Groups are non-capturing: only the match itself matters, here and in the
+# combined row pattern built from these below.
+NAME_ASCII_RE = re.compile(r"[A-Z][a-z']+(?: [A-Z][a-z]+)?")
+NAME_DIACRITICS_RE = re.compile(r".*")
+DESIGNATION_RE = re.compile(r"(?:(?:HR |HD |GJ |WASP-|HAT-P-|XO-|HIP |TrES-|BD[+-]\d{1,2} )\d{1,6}|PSR .+)")
+ID_RE = re.compile(r"(?:[A-Za-z]{0,3}\d{0,4}|_)")
+ID_DIACRITICS_RE = re.compile(r"(?:V\d+|[α-ωb-zAY]{0,3}\d{0,4}|_)")
+CON_RE = re.compile(r"(?:_|[A-Z][A-Za-z]{2})")
+COMPONENT_RE = re.compile(r"(?:_|A|Aa|Aa1|C|Ca|B)")
+WDS_J_RE = re.compile(r"(?:_|(?:\d{5}[-+]\d{4}))")
+BAND_RE = re.compile(r"[GV_]")
+HIP_RE = re.compile(r"(?:\d{1,6}|_)")
+HD_RE = re.compile(r"(?:\d{1,6}|_)")
+DATE_RE = re.compile(r"20[12]\d-(?:1[0-2]|0[1-9])-(?:3[01]|[12]\d|0[1-9])")
+NOTES_RE = re.compile(r"[*@]?")
+
+# Numeric check functions parse the value once; unparsable values fail validation
+def valid_mag(value):
+    if value == "_":
+        return True
+    try:
+        return -2 < float(value) < 13
+    except ValueError:
+        return False
+
+def valid_ra(value):
+    try:
+        return 0 <= float(value) <= 360
+    except ValueError:
+        return False
+
+def valid_dec(value):
+    try:
+        return -90 <= float(value) <= 90
+    except ValueError:
+        return False
+
 # Column definitions with validation rules
-# description, [start col, end col], alignment, validator, preprocessor
+# description, [start col, end col], alignment, pattern, check, preprocessor, nullable
+# A column is validated either by fullmatching its pattern or by its check function;
+# the other one is None.
+# A nullable column accepts "_" for a missing value, which skips its validator.
+# The patterns are anchored by fullmatch and free of nested quantifiers,
+# so the re engine never backtracks more than a few characters on these short fields.
 # fmt:off
 columns = [
-    ["Name/ASCII", [1, 17], "left", re.compile("[A-Z][a-z']+( [A-Z][a-z]+)?").fullmatch, dummy_preprocess],
-    ["Name/Diacritics", [19, 35], "left", re.compile(".*").fullmatch, dummy_preprocess],
-    ["Designation", [37, 48], "left", re.compile("((HR |HD |GJ |WASP-|HAT-P-|XO-|HIP |TrES-|BD[+-]\d{1,2} )\d{1,6}|PSR .+)").fullmatch, dummy_preprocess],
-    ["ID", [50, 54], "left", re.compile("([A-Za-z]{0,3}\d{0,4}|_)").fullmatch, dummy_preprocess],
-    ["ID/Diacritics", [56, 60], "left", re.compile("(V\d+|[α-ωb-zAY]{0,3}\d{0,4}|_)").fullmatch, lowercase_preprocess],
-    ["Con", [62, 64], "left", re.compile("(_|[A-Z][A-Za-z]{2})").fullmatch, dummy_preprocess],
-    ["#", [66, 69], "left", re.compile("(_|A|Aa|Aa1|C|Ca|B)").fullmatch, empty_to_underscore_preprocess],
-    ["WDS_J", [71, 80], "left", re.compile("(_|(\d{5}[-+]\d{4}))").fullmatch, dummy_preprocess],
-    ["mag", [82, 86], "right", lambda x: x == "_" or (float(x) > -2 and float(x) < 13), dummy_preprocess],
-    ["bnd", [88, 89], "right", re.compile("[GV_]").fullmatch, dummy_preprocess],
-    ["HIP", [91, 96], "right", re.compile("(\d{1,6}|_)").fullmatch, dummy_preprocess],
-    ["HD", [98, 103], "right", re.compile("(\d{1,6}|_)").fullmatch, dummy_preprocess],
-    ["RA(J2000)", [105, 114], "right", lambda x: float(x) >= 0 and float(x) <= 360, dummy_preprocess],
-    ["Dec(J2000)", [116, 125], "right", lambda x: float(x) >= -90 and float(x) <= 90, dummy_preprocess],
-    ["Date", [127, 136], "right", re.compile("20[12]\d-(1[0-2]|0[1-9])-(3[01]|[12]\d|0[1-9])").fullmatch, dummy_preprocess],
-    ["notes", [138, 138], "right", re.compile("[*@]?").fullmatch, dummy_preprocess],
+    ["Name/ASCII", [1, 17], "left", NAME_ASCII_RE, None, dummy_preprocess, False],
+    ["Name/Diacritics", [19, 35], "left", NAME_DIACRITICS_RE, None, dummy_preprocess, False],
+    ["Designation", [37, 48], "left", DESIGNATION_RE, None, dummy_preprocess, False],
+    ["ID", [50, 54], "left", ID_RE, None, dummy_preprocess, True],
+    ["ID/Diacritics", [56, 60], "left", ID_DIACRITICS_RE, None, lowercase_preprocess, True],
+    ["Con", [62, 64], "left", CON_RE, None, dummy_preprocess, True],
+    ["#", [66, 69], "left", COMPONENT_RE, None, empty_to_underscore_preprocess, True],
+    ["WDS_J", [71, 80], "left", WDS_J_RE, None, dummy_preprocess, True],
+    ["mag", [82, 86], "right", None, valid_mag, dummy_preprocess, True],
+    ["bnd", [88, 89], "right", BAND_RE, None, dummy_preprocess, True],
+    ["HIP", [91, 96], "right", HIP_RE, None, dummy_preprocess, True],
+    ["HD", [98, 103], "right", HD_RE, None, dummy_preprocess, True],
+    ["RA(J2000)", [105, 114], "right", None, valid_ra, dummy_preprocess, False],
+    ["Dec(J2000)", [116, 125], "right", None, valid_dec, dummy_preprocess, False],
+    ["Date", [127, 136], "right", DATE_RE, None, dummy_preprocess, False],
+    ["notes", [138, 138], "right", NOTES_RE, None, dummy_preprocess, False],
 ]
 # fmt:on
 
@@ -145,81 +185,215 @@ columns = [
 for c in columns:
     assert c[1][1] >= c[1][0], "Invalid column interval"
     assert c[2] in ["left", "right"], "Invalid alignment"
+    assert (c[3] is None) != (c[4] is None), "Column needs exactly one of pattern and check"
+    assert not c[6] or (c[3].fullmatch if c[3] is not None else c[4])("_"), "Nullable column must accept '_'"
 for i in range(len(columns) - 1):
     assert columns[i + 1][1][0] - columns[i][1][1] == 2, "Invalid spacing between columns"
 
-# Parse the catalog
-raw_lines = open(catalog_local_copy, "r").readlines()
-json_data = []
-normalized_lines = []
-csv_lines = ["\t".join(i[0] for i in columns)]  # CSV header
-
-for line in raw_lines:
-    line = line.strip("\r\n\t ")
-    if not line:
-        normalized_lines.append("")
-        continue
-    if line[0] in "#$":
-        normalized_lines.append("#" + line[1:])
-        continue
-
-    entry = collections.OrderedDict()
-    csv_line = []
-    normalized_line = []
-
-    for key, interval, alignment, validator, preprocessor in columns:
-        value = line[interval[0] - 1 : interval[1]].strip()
-
-        if not validator(value):
-            preprocessed_value = preprocessor(value)
-            if preprocessed_value != value:
-                print(f"Warning: Preprocessing applied for {key}. Original: '{value}', Preprocessed: '{preprocessed_value}'")
-
-            if not validator(preprocessed_value):
-                print(f"Failed validation of {key}: value '{value}' is unexpected.")
-                print(line)
-                print("Continuing with unchanged value.")
-                print("")
-            else:
-                value = preprocessed_value
-
-        entry[key] = value
-        csv_line.append(value)
-        normalized_value = value.ljust(interval[1] - interval[0] + 1) if alignment == "left" else value.rjust(interval[1] - interval[0] + 1)
-        normalized_line.append(normalized_value)
-
-    json_data.append(entry)
-    csv_lines.append("\t".join(csv_line))
-    normalized_lines.append(" ".join(normalized_line))
-
-# Generate output files
-normalized_text = "\n".join(normalized_lines) + "\n"
-csv_text = "\n".join(csv_lines) + "\n"
-
-print("Recording normalized catalog...")
-with open("catalog_data/IAU-CSN_normalized.txt", "w", newline="\n") as f:
-    f.write(normalized_text)
-
-print("Recording csv catalog with tab separator...")
-with open("catalog_data/IAU-CSN.tsv", "w", newline="\n") as f:
-    f.write(csv_text)
-
-print("Recording json catalog...")
-with open("catalog_data/IAU-CSN.json", "w", newline="\n") as f:
-    json.dump(json_data, f, indent=2, ensure_ascii=False)
-
-# Compare original and normalized files
-original_lines = [line.rstrip() + "\n" for line in raw_lines]
-normalized_lines = [line.rstrip() + "\n" for line in normalized_lines]
-diffs = list(difflib.context_diff(original_lines, normalized_lines, fromfile=catalog_local_copy, tofile="catalog_data/IAU-CSN_normalized.txt", n=0))
+# Column descriptors as parallel tuples, so the row loop zips flat sequences
+# instead of unpacking nested lists, and the pad widths are computed once
+names = tuple(c[0] for c in columns)
+starts = tuple(c[1][0] - 1 for c in columns)
+ends = tuple(c[1][1] for c in columns)
+widths = tuple(e - s for s, e in zip(starts, ends))
+alignments = tuple("<" if c[2] == "left" else ">" for c in columns)
+patterns = tuple(c[3] for c in columns)
+validators = tuple(c[3].fullmatch if c[3] is not None else c[4] for c in columns)
+preprocessors = tuple(c[5] for c in columns)
+nullables = tuple(c[6] for c in columns)
+column_indices = range(len(columns))
+
+# TSV header line, assembled once from the column names
+tsv_header = "\t".join(names) + "\n"
+
+# Format template for a whole normalized line, generated once from the column layout,
+# so a row is padded and joined by a single str.format call
+row_format = " ".join(f"{{:{a}{w}}}" for a, w in zip(alignments, widths)).format
+
+# Fixed-width field extractor: a single C-level call slices every column of a row
+column_slicer = operator.itemgetter(*(slice(s, e) for s, e in zip(starts, ends)))
+
+# All column patterns combined into one pattern over the tab-joined fields of a row,
+# so a valid row is checked in a single scan. Columns validated by a check function
+# match anything here and run their check separately.
+row_validator = re.compile("\t".join(f"(?:{p.pattern})" if p is not None else "[^\t]*" for p in patterns)).fullmatch
+extra_checks = tuple((k, c[4]) for k, c in zip(column_indices, columns) if c[4] is not None)
+
+# Per-column records for the row loops, zipped once here instead of on every row
+field_checks = tuple(zip(column_indices, names, validators, preprocessors, nullables))
+
+def extra_checks_valid(fields):
+    """Run the check functions of the columns the combined row pattern lets through."""
+    for k, validator in extra_checks:
+        if not validator(fields[k]):
+            return False
+    return True
+
+def fix_invalid_value(key, value, validator, preprocessor, line):
+    """
+    Fallback for a value that failed validation: try the column preprocessor
+    and report what happened. Returns the value to keep.
+    """
+    preprocessed_value = preprocessor(value)
+    if preprocessed_value != value:
+        print(f"Warning: Preprocessing applied for {key}. Original: '{value}', Preprocessed: '{preprocessed_value}'")
+
+    if not validator(preprocessed_value):
+        print(f"Failed validation of {key}: value '{value}' is unexpected.")
+        print(line)
+        print("Continuing with unchanged value.")
+        print("")
+        return value
+    return preprocessed_value
+
+def parse_line(line):
+    """
+    Split a catalog data line into its columns.
+    Returns the entry, its field values and the normalized line.
+    """
+    csv_line = list(map(str.strip, column_slicer(line)))
 
-if not diffs:
-    print("The downloaded catalog and the normalized catalog have no significant differences.")
-else:
-    print("The downloaded catalog and the normalized catalog have differences:")
-    print("".join(diffs))
+    # Fast path: one combined scan plus the check functions. Rows that fail it,
+    # or whose inner tabs would blur the field boundaries, are checked field by field.
+    if "\t" in line or not row_validator("\t".join(csv_line)) or not extra_checks_valid(csv_line):
+        for (k, key, validator, preprocessor, nullable), value in zip(field_checks, csv_line):
+            if (value != "_" or not nullable) and not validator(value):
+                csv_line[k] = fix_invalid_value(key, value, validator, preprocessor, line)
 
-print("Processing complete.")
+    return dict(zip(names, csv_line)), csv_line, row_format(*csv_line)
 
-if not_downloaded:
-    print("Note: Used existing IAU-CSN.txt file. Delete it to download the latest version.")
+def parse_catalog(lines):
+    """
+    Generator over the catalog lines, so rows flow straight to the output files.
+    Yields the normalized line with the entry and its field values,
+    which are None for blank and comment lines.
+    """
+    for line in lines:
+        line = line.strip("\r\n\t ")
+        if not line:
+            yield "", None, None
+        elif line[0] in "#$":
+            yield "#" + line[1:], None, None
+        else:
+            entry, csv_line, normalized_line = parse_line(line)
+            yield normalized_line, entry, csv_line
+
+def parse_chunk(lines):
+    """
+    Parse a chunk of catalog lines in a worker process.
+    Diagnostics are captured and returned so they can be printed in catalog order.
+    """
+    with contextlib.redirect_stdout(io.StringIO()) as messages:
+        rows = list(parse_catalog(lines))
+    return rows, messages.getvalue()
+
+def parse_catalog_parallel(lines):
+    """Same rows as parse_catalog, parsed in one chunk per CPU by a process pool."""
+    lines = list(lines)  # the pool needs every chunk up front
+    chunk_size = max(1, -(-len(lines) // (os.cpu_count() or 1)))
+    chunks = [lines[i : i + chunk_size] for i in range(0, len(lines), chunk_size)]
+    with ProcessPoolExecutor() as executor:
+        for rows, messages in executor.map(parse_chunk, chunks):
+            print(messages, end="")
+            yield from rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Download and process the IAU Catalog of Star Names.")
+    parser.add_argument("--parallel", action="store_true", help="parse the catalog with a pool of worker processes (only pays off for very large catalogs)")
+    args = parser.parse_args()
+
+    # Create output directory
+    if not os.path.exists("catalog_data"):
+        print('Creating folder "catalog_data"...')
+        os.makedirs("catalog_data")
+
+    # Download or use existing catalog file
+    catalog_local_copy = "catalog_data/IAU-CSN.txt"
+    not_downloaded = False
+
+    if os.path.exists(catalog_local_copy):
+        print(f"{catalog_local_copy} already exists. Using existing file.")
+        print("Delete the file and run this script again to download the current version.")
+        not_downloaded = True
+    else:
+        print("Downloading star names from WGSN...")
+        local_proxies = request.getproxies()
+        if local_proxies:
+            print("Proxy server found. Using", local_proxies)
+            request.install_opener(request.build_opener(request.ProxyHandler(local_proxies)))
+        request.urlretrieve("http://www.pas.rochester.edu/~emamajek/WGSN/IAU-CSN.txt", catalog_local_copy)
+
+    # Parse the catalog and record the three output files in a single pass,
+    # streaming the input line by line without keeping the catalog in memory
+    # (except with --parallel, where the pool needs the whole catalog up front).
+    # The outputs are written to temporary files and only moved into place once the
+    # whole catalog went through, so a failed run leaves the previous files intact.
+    outputs = ["catalog_data/IAU-CSN_normalized.txt", "catalog_data/IAU-CSN.tsv", "catalog_data/IAU-CSN.json"]
+    temporary_outputs = [path + ".tmp" for path in outputs]
+    differs = False
+    normalized_empty = True
+
+    print("Recording normalized, csv (tab separated) and json catalogs...")
+    try:
+        with open(catalog_local_copy, "r", encoding="utf-8") as f_in, open(temporary_outputs[0], "w", newline="\n") as f_norm, open(temporary_outputs[1], "w", newline="\n") as f_tsv, open(temporary_outputs[2], "w", newline="\n") as f_json:
+            f_tsv.write(tsv_header)
+            # The json array is streamed one entry at a time, indented as json.dump(..., indent=2) would
+            json_encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+            f_json.write("[")
+            json_separator = "\n  "  # becomes ",\n  " once the first entry is written
+            json_empty = True
+
+            if args.parallel:
+                # The pool needs every chunk up front, so the catalog is read once into
+                # a list that both the parser and the comparison walk
+                raw_lines = parser_input = f_in.readlines()
+                parse = parse_catalog_parallel
+            else:
+                # The parser and the comparison with the original both walk the input;
+                # tee only buffers the line the parser is ahead by
+                raw_lines, parser_input = itertools.tee(f_in)
+                parse = parse_catalog
+            for raw_line, (normalized_line, entry, csv_line) in zip(raw_lines, parse(parser_input)):
+                differs = differs or raw_line.rstrip() != normalized_line.rstrip()
+                f_norm.writelines((normalized_line, "\n"))
+                normalized_empty = False
+                if entry is not None:
+                    f_tsv.writelines(("\t".join(csv_line), "\n"))
+                    f_json.write(json_separator)
+                    f_json.writelines(chunk.replace("\n", "\n  ") for chunk in json_encoder.iterencode(entry))
+                    json_separator = ",\n  "
+                    json_empty = False
+
+            f_json.write("]" if json_empty else "\n]")
+            if normalized_empty:
+                f_norm.write("\n")  # an empty catalog still normalizes to a single line break
+    except BaseException:
+        for path in temporary_outputs:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    for temporary_path, path in zip(temporary_outputs, outputs):
+        os.replace(temporary_path, path)
+
+    # Compare original and normalized files. Both are only read back for difflib
+    # when a line actually changed.
+    if not differs:
+        print("The downloaded catalog and the normalized catalog have no significant differences.")
+    else:
+        # readlines() splits exactly like the streaming comparison above; str.splitlines()
+        # would also break on form feeds and other separators and shift the hunk numbers
+        with open(catalog_local_copy, "r", encoding="utf-8") as f:
+            original_lines = [line.rstrip() + "\n" for line in f.readlines()]
+        with open("catalog_data/IAU-CSN_normalized.txt", "r", encoding="utf-8") as f:
+            normalized_lines = [line.rstrip() + "\n" for line in f.readlines()]
+        diffs = difflib.context_diff(original_lines, normalized_lines, fromfile=catalog_local_copy, tofile="catalog_data/IAU-CSN_normalized.txt", n=0)
+        print("The downloaded catalog and the normalized catalog have differences:")
+        print("".join(diffs))
+
+    print("Processing complete.")
+
+    if not_downloaded:
+        print("Note: Used existing IAU-CSN.txt file. Delete it to download the latest version.")
+
+if __name__ == "__main__":
+    main()